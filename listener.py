@@ -1,14 +1,14 @@
 import tkinter as tk
 import sounddevice as sd
 import numpy as np
-import queue
+import threading
 from protocol import IncrementalDecoder, SAMPLE_RATE
 
 class ListenerGUI:
     def __init__(self, master):
         self.master = master
         self.decoder = IncrementalDecoder()  # Stateful decoder instance
-        self.q = queue.Queue()               # Queue to handle decoded messages
+        self.new_audio = threading.Event()   # Set by the audio thread when the decoder has new samples
         self.running = False                 # Controls the listening loop
         self.history = []                    # List of previously decoded messages
 
@@ -64,8 +64,8 @@ class ListenerGUI:
         ), wraplength=420, justify="left", fg="gray", font=("Courier", 12))
         self.explanation.pack(pady=10)
 
-        # Start polling for messages from the audio callback
-        self.master.after(100, self.process_queue)
+        # Start polling the decoder for progress made by the audio callback
+        self.master.after(100, self.poll_decoder)
 
     # Called in real-time as new audio chunks arrive
     def audio_callback(self, indata, frames, time, status):
@@ -73,15 +73,15 @@ class ListenerGUI:
             print(status)
         mono = indata[:, 0] if indata.ndim > 1 else indata
         self.decoder.feed_samples(mono)
-        msg = self.decoder.get_message()
-        self.q.put(msg)
+        self.new_audio.set()  # Message formatting happens on the GUI thread
         if self.decoder.is_done():
             self.running = False
+            raise sd.CallbackStop  # No more audio needed once the postamble is in
 
     # Called when user clicks "Start Listening"
     def start_listening(self):
         self.decoder = IncrementalDecoder()  # Reset decoder
-        self.q = queue.Queue()
+        self.new_audio.clear()
         self.running = True
         self.output_label.config(text="Listening...")
 
@@ -89,9 +89,10 @@ class ListenerGUI:
         self.stream = sd.InputStream(
             samplerate=SAMPLE_RATE,
             channels=1,
-            blocksize=int(0.1 * SAMPLE_RATE),
+            blocksize=2048,  # ~46 ms; tones are reassembled across blocks by the decoder
+            latency='low',
             callback=self.audio_callback,
-            dtype='float32'
+            dtype='int16'  # Native mic format; half the bytes of float32
         )
         self.stream.start()
 
@@ -117,19 +118,17 @@ class ListenerGUI:
             self.history_box.insert(tk.END, f"{idx}. {msg}\n\n")
         self.history_box.config(state=tk.DISABLED)
 
-    # Regularly called by Tkinter to process any messages in the queue
-    def process_queue(self):
-        try:
-            while not self.q.empty():
-                msg = self.q.get_nowait()
-                self.output_label.config(text="Partial decode:\n" + msg)
-                if self.decoder.is_done():
-                    self.update_history(msg)
-                    self.stop_listening()
-        except queue.Empty:
-            pass
-        finally:
-            self.master.after(100, self.process_queue)
+    # Regularly called by Tkinter to show the latest decode; the audio thread
+    # only raises a flag instead of formatting and queueing every partial message
+    def poll_decoder(self):
+        if self.new_audio.is_set():
+            self.new_audio.clear()
+            msg = self.decoder.get_message()
+            self.output_label.config(text="Partial decode:\n" + msg)
+            if self.decoder.is_done():
+                self.update_history(msg)
+                self.stop_listening()
+        self.master.after(100, self.poll_decoder)
 
 # Start the GUI
 def main():
@@ -1,3 +1,5 @@
+import warnings
+
 import numpy as np
 
 # Constants
@@ -14,23 +16,97 @@ STEP_SIZE = 40       # Hz offset between characters
 char_to_freq = {char: BASE_FREQ + i * STEP_SIZE for i, char in enumerate(CHARSET)}
 freq_to_char = {v: k for k, v in char_to_freq.items()}
 
+# Same map as arrays: CHARSET index -> freq, and ASCII code -> CHARSET index (-1 = unsupported)
+_char_freqs = BASE_FREQ + STEP_SIZE * np.arange(len(CHARSET))
+_char_index = np.full(256, -1, dtype=np.intp)
+_char_index[np.frombuffer(CHARSET.encode('ascii'), dtype=np.uint8)] = np.arange(len(CHARSET))
+
+# Checksum lookup: ASCII code -> value added to the checksum (0 outside CHARSET)
+_charset_codes = np.frombuffer(CHARSET.encode('ascii'), dtype=np.uint8).astype(np.int64)
+_checksum_lut = np.zeros(256, dtype=np.int64)
+_checksum_lut[_charset_codes] = _charset_codes
+
 # Pre- & post- amble tones: special "beeps" to mark the start and end
 PREAMBLE_FREQ = 2250
 PREAMBLE_DURATION = 0.5
 POSTAMBLE_FREQ = 2500
 POSTAMBLE_DURATION = 0.5
 
+# Emitted audio is 16-bit PCM, the format the sound card plays natively
+PCM_FULL_SCALE = 32767
+
+def _to_pcm16(wave):
+    """Convert a float wave to int16 PCM, clipping anything outside [-1, 1] (e.g. amplitude > 1)."""
+    return np.rint(np.clip(wave * PCM_FULL_SCALE, -PCM_FULL_SCALE, PCM_FULL_SCALE)).astype(np.int16)
+
 # Tonebank: cache sine waves for each character
 _samples_per_tone = int(SAMPLE_RATE * TONE_DURATION)
 _time = np.linspace(0, TONE_DURATION, _samples_per_tone, endpoint=False)
-tonebank = {
-    char: AMPLITUDE * np.sin(2 * np.pi * freq * _time)
-    for char, freq in char_to_freq.items()
-}
+# Unit-amplitude sines never change, so amplitude/fade updates only rescale them
+_unit_tones = np.sin(2 * np.pi * np.outer(_char_freqs, _time))
+# One row per CHARSET index so a whole message is a single gather; the dict
+# gives per-character access to the same rows. Both are updated in place.
+_tonebank_matrix = _to_pcm16(AMPLITUDE * _unit_tones)
+tonebank = dict(zip(CHARSET, _tonebank_matrix))
+
+# Goertzel bank: the emitter only ever produces these tones (characters first,
+# then preamble and postamble), so the decoder measures exactly these bins
+TARGET_FREQS = np.append(_char_freqs, [PREAMBLE_FREQ, POSTAMBLE_FREQ]).astype(float)
+# Basis columns are [cos | sin] for every target, so one product yields both parts
+_goertzel_phase = 2 * np.pi * np.outer(np.arange(_samples_per_tone), TARGET_FREQS) / SAMPLE_RATE
+_goertzel_basis = np.concatenate([np.cos(_goertzel_phase), np.sin(_goertzel_phase)], axis=1).astype(np.float32)
+del _goertzel_phase
+# The bank always has a strongest bin, so a chunk only counts as carrying a tone
+# when that bin holds this many times the power white noise of the same energy
+# would put in a single bin (silence, broadband noise, hum and off-band tones
+# all fall well below it)
+TONE_TO_NOISE_RATIO = 30
+# Chunks whose bank entropy (bits, see entropy_bits) exceeds these are flagged
+# uncertain. Over 43 bins the maximum is log2(43) ~ 5.4 bits, and pure noise
+# measures ~5.2. A clean tone (amplitude 0.5) measures ~0.3; with added white
+# noise of sigma 0.1 / 0.2 / 0.3 / 0.5 / 1.0 it measures about 1.2 / 1.8 / 2.3 /
+# 3.0 / 3.9. The one-shot batch decode flags anything noisier than sigma ~0.25;
+# the live listener is more lenient (as it always was) and only flags chunks
+# from sigma ~0.5 up, i.e. noise as strong as the tone itself.
+BATCH_ENTROPY_THRESHOLD = 2.0
+STREAM_ENTROPY_THRESHOLD = 3.0
+# Bank index of the postamble (CHARSET indices come first, then the preamble)
+_postamble_tone = len(CHARSET) + 1
+
+def _warn_tolerance_ignored():
+    """The decoders used to accept tones within `tolerance` Hz; the tone bank made that setting meaningless."""
+    warnings.warn(
+        "tolerance is deprecated and ignored: the decoder only recognizes the exact "
+        "transmitted frequencies (to within about one DFT bin, ~3 Hz)",
+        DeprecationWarning, stacklevel=3)
+
+# Preamble search: the receiver looks for the preamble within the first few
+# seconds; the mixer shifts PREAMBLE_FREQ down to DC over that whole span
+_preamble_samples = int(SAMPLE_RATE * PREAMBLE_DURATION)
+_preamble_search_samples = 5 * SAMPLE_RATE + _preamble_samples
+_preamble_mixer = np.exp(-2j * np.pi * PREAMBLE_FREQ * np.arange(_preamble_search_samples) / SAMPLE_RATE)
+# The mixer repeats every this many samples, so a stream at any absolute
+# position n can be mixed starting from _preamble_mixer[n % period]
+_preamble_mixer_period = SAMPLE_RATE // np.gcd(SAMPLE_RATE, PREAMBLE_FREQ)
+
+# IncrementalDecoder keeps at most two preamble lengths of unconsumed audio
+# (while locking onto the preamble), so this leaves room for incoming blocks
+_decoder_buffer_samples = 4 * _preamble_samples
+_decoded_capacity = 64  # Initial room for decoded characters; doubled as needed
+
+def _amble_wave(freq, duration):
+    """Plain sine at the current AMPLITUDE, used for the preamble and postamble."""
+    samples = int(SAMPLE_RATE * duration)
+    t = np.linspace(0, duration, samples, endpoint=False)
+    return _to_pcm16(AMPLITUDE * np.sin(2 * np.pi * freq * t))
+
+# Pre- & post- amble waves only depend on AMPLITUDE, so build them once too
+_preamble_wave = _amble_wave(PREAMBLE_FREQ, PREAMBLE_DURATION)
+_postamble_wave = _amble_wave(POSTAMBLE_FREQ, POSTAMBLE_DURATION)
 
 def set_transmission_params(amplitude, fade_time=0.01):
     """Update amplitude and apply fade-in/out to each tone."""
-    global AMPLITUDE, tonebank
+    global AMPLITUDE, _preamble_wave, _postamble_wave
     AMPLITUDE = amplitude
 
     fade_samples = int(fade_time * SAMPLE_RATE)
@@ -43,56 +119,225 @@ def set_transmission_params(amplitude, fade_time=0.01):
         envelope[-fade_samples:] = fade_out
     # else: keep as ones (no fading)
 
-    tonebank = {
-        char: AMPLITUDE * np.sin(2 * np.pi * freq * _time) * envelope
-        for char, freq in char_to_freq.items()
-    }
+    # Rescale straight into the existing int16 rows (tonebank views included),
+    # clipping first as _to_pcm16 does so amplitudes above 1 cannot wrap around
+    scaled = _unit_tones * (AMPLITUDE * envelope * PCM_FULL_SCALE)
+    np.clip(scaled, -PCM_FULL_SCALE, PCM_FULL_SCALE, out=scaled)
+    np.rint(scaled, out=_tonebank_matrix, casting='unsafe')
+    _preamble_wave = _amble_wave(PREAMBLE_FREQ, PREAMBLE_DURATION)
+    _postamble_wave = _amble_wave(POSTAMBLE_FREQ, POSTAMBLE_DURATION)
 
 def generate_preamble():
-    """Short beep before the message to help the receiver sync up."""
-    preamble_samples = int(SAMPLE_RATE * PREAMBLE_DURATION)
-    t = np.linspace(0, PREAMBLE_DURATION, preamble_samples, endpoint=False)
-    return AMPLITUDE * np.sin(2 * np.pi * PREAMBLE_FREQ * t)
+    """Short beep before the message to help the receiver sync up (cached; do not modify)."""
+    return _preamble_wave
 
 def generate_postamble():
-    """Short beep after the message to signal the end."""
-    postamble_samples = int(SAMPLE_RATE * POSTAMBLE_DURATION)
-    t = np.linspace(0, POSTAMBLE_DURATION, postamble_samples, endpoint=False)
-    return AMPLITUDE * np.sin(2 * np.pi * POSTAMBLE_FREQ * t)
+    """Short beep after the message to signal the end (cached; do not modify)."""
+    return _postamble_wave
+
+def is_valid_text(text):
+    """True if every character of text (case-insensitive) is in CHARSET."""
+    text = text.upper()
+    codes = np.frombuffer(text.encode('ascii', 'ignore'), dtype=np.uint8)
+    # Non-ASCII characters are dropped by the encode, so they show up as a length mismatch
+    return len(codes) == len(text) and bool((_char_index[codes] >= 0).all())
 
 def compute_checksum_char(text):
     """Compute a simple checksum: sum of ASCII values mod len(CHARSET)"""
-    s = sum(ord(c) for c in text if c in CHARSET)
-    return CHARSET[s % len(CHARSET)]
+    codes = np.frombuffer(text.encode('ascii', 'ignore'), dtype=np.uint8)
+    return CHARSET[int(_checksum_lut[codes].sum()) % len(CHARSET)]
+
+def compute_checksum_index(char_idxs):
+    """Same checksum for a message given as CHARSET indices (-1 = undecoded, skipped); returns a CHARSET index."""
+    char_idxs = np.asarray(char_idxs, dtype=np.intp)
+    return int(_charset_codes[char_idxs[char_idxs >= 0]].sum()) % len(CHARSET)
+
+def goertzel_bank(chunk):
+    """
+    Squared magnitude of each TARGET_FREQS bin for a tone-sized chunk.
+
+    This is what a bank of Goertzel filters yields; the whole bank is evaluated
+    as one matrix product against a precomputed cos/sin basis, which keeps
+    the per-sample recurrence out of the Python interpreter.
+    Accepts a single chunk or a 2-D stack of chunks (one per row).
+    """
+    projection = chunk @ _goertzel_basis
+    re = projection[..., :len(TARGET_FREQS)]
+    im = projection[..., len(TARGET_FREQS):]
+    return re * re + im * im
+
+def dominant_tone(power, chunk):
+    """
+    Index into TARGET_FREQS of the strongest bank bin of each chunk (power from
+    goertzel_bank), or -1 where it does not rise TONE_TO_NOISE_RATIO above the
+    noise floor. For white noise every bin's expected power equals the chunk's
+    energy, so that is the floor; silent chunks always give -1.
+    """
+    energy = np.einsum('...i,...i->...', chunk, chunk)
+    k = power.argmax(axis=-1)
+    peak = np.take_along_axis(power, np.expand_dims(k, -1), axis=-1)[..., 0]
+    return np.where(peak > TONE_TO_NOISE_RATIO * energy, k, -1)
+
+def detect_freq(chunk):
+    """Returns which of the known tones (TARGET_FREQS) dominates a chunk; 0 Hz if none does (noise or silence)."""
+    k = dominant_tone(goertzel_bank(chunk), chunk)
+    return TARGET_FREQS[k] if k >= 0 else 0.0
+
+def entropy_bits(magnitudes):
+    """
+    Shannon entropy (bits) of magnitudes normalized along the last axis.
+    Computed as log(S) - sum(m * log(m)) / S with S = sum(m), which avoids
+    materializing the normalized distribution. All-zero rows give inf.
+    """
+    totals = magnitudes.sum(axis=-1)
+    weighted = np.log(magnitudes + 1e-12)
+    np.multiply(magnitudes, weighted, out=weighted)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        entropy = (np.log(totals) - weighted.sum(axis=-1) / totals) / np.log(2)
+    # fully silent => treat as "infinite" uncertainty
+    return np.where(totals > 0, entropy, np.inf)
+
+def chunk_entropy(chunk):
+    """Shannon entropy of the Goertzel bank magnitudes of a chunk."""
+    return float(entropy_bits(np.sqrt(goertzel_bank(chunk))))
+
+def analyze_chunk(chunk):
+    """
+    Dominant tone frequency (0 Hz if none, see detect_freq) and bank entropy
+    of a chunk, i.e. detect_freq and chunk_entropy from a single bank evaluation.
+    """
+    power = goertzel_bank(chunk)
+    k = dominant_tone(power, chunk)
+    freq = TARGET_FREQS[k] if k >= 0 else 0.0
+    return freq, float(entropy_bits(np.sqrt(power)))
+
+def match_freq_to_index(freq, tolerance=20):
+    """
+    Maps a frequency to the CHARSET index of the nearest character tone, or -1 if none is within tolerance.
+    Character tones form an arithmetic progression, so the nearest one is found by rounding.
+    """
+    idx = int(round((freq - BASE_FREQ) / STEP_SIZE))
+    if 0 <= idx < len(CHARSET) and abs(freq - (BASE_FREQ + idx * STEP_SIZE)) < tolerance:
+        return idx
+    return -1
+
+def match_freq_to_char(freq, tolerance=20):
+    """Maps a frequency to the nearest character, or "" if none is within tolerance."""
+    idx = match_freq_to_index(freq, tolerance)
+    return CHARSET[idx] if idx >= 0 else ""
+
+def _preamble_power(signal):
+    """
+    Power in the preamble bin for every full preamble-length window of signal
+    (at most _preamble_search_samples long), i.e. the cross-correlation with the
+    preamble tone at every offset. Mixing the signal down by PREAMBLE_FREQ turns
+    each window's DFT bin into a difference of two running sums, so all offsets
+    cost O(len(signal)).
+    """
+    mixed = signal * _preamble_mixer[:len(signal)]
+    cumulative = np.concatenate(([0], np.cumsum(mixed)))
+    return np.abs(cumulative[_preamble_samples:] - cumulative[:-_preamble_samples]) ** 2
+
+def _preamble_scores(signal):
+    """
+    For every preamble-length window of signal, returns
+    - the share of the window's energy that sits in the preamble bin (1.0 when
+      it lines up exactly with a clean preamble), which peaks at the best
+      alignment but shrinks with noise, DC offset or hum, so it is only used
+      to pick the offset;
+    - whether the preamble bin rises TONE_TO_NOISE_RATIO above the noise floor
+      (the window's energy, see dominant_tone), which decides if a preamble is
+      present at all.
+    """
+    cumulative = np.concatenate(([0.0], np.cumsum(signal * signal, dtype=float)))
+    energy = cumulative[_preamble_samples:] - cumulative[:-_preamble_samples]
+    power = _preamble_power(signal)
+    return power / np.maximum(energy * _preamble_samples / 2, 1e-12), power > TONE_TO_NOISE_RATIO * energy
+
+def _format_decoded(char_idxs, uncertain):
+    """
+    Build the user-facing message from per-chunk CHARSET indices (-1 = no match)
+    and uncertainty flags.
+    The last decoded character is treated as a checksum.
+    Uncertain characters are reported by their 1-based positions in the message.
+    """
+    if len(char_idxs) == 0:
+        return ""
+
+    # With 2+ characters, assume the final chunk is the checksum.
+    has_checksum = len(char_idxs) >= 2
+    if has_checksum:
+        char_idxs, checksum_idx = char_idxs[:-1], char_idxs[-1]
+        uncertain = uncertain[:-1]
+
+    # Unmatched chunks contribute no character but still count as positions
+    result = _charset_codes[char_idxs[char_idxs >= 0]].astype(np.uint8).tobytes().decode('ascii')
+    if has_checksum and checksum_idx != compute_checksum_index(char_idxs):
+        result += " [CHECKSUM MISMATCH]"
+
+    uncertain_positions = np.flatnonzero(uncertain & (char_idxs >= 0)) + 1
+    if uncertain_positions.size:
+        friendly = [f"#{pos}" for pos in uncertain_positions]
+        result += f" [UNCERTAIN characters at positions {', '.join(friendly)}]"
+
+    return result
+
+def _message_tones(text):
+    """CHARSET indices of the tones to send for text: valid characters plus checksum (empty if none are valid)."""
+    codes = np.frombuffer(text.upper().encode('ascii', 'ignore'), dtype=np.uint8)
+    char_idxs = _char_index[codes]
+    char_idxs = char_idxs[char_idxs >= 0]
+    if len(char_idxs) == 0:
+        return char_idxs
+    return np.append(char_idxs, compute_checksum_index(char_idxs))
 
 def encode_text_to_waveform(text):
     """
     Attach preamble + message tones + (optional) checksum tone + postamble.
+    Returns int16 PCM samples at SAMPLE_RATE.
 
     - Filters out any characters not in CHARSET/tonebank.
     - If we have zero valid chars, skip checksum and just send preamble + short silence.
     """
-    text = text.upper()
-    valid_chars = [ch for ch in text if ch in tonebank]
+    tones = _message_tones(text)
 
-    # If no recognized characters, send just preamble + silence
-    if len(valid_chars) == 0:
-        return np.concatenate([generate_preamble(), np.zeros_like(_time)])
+    preamble_len = len(_preamble_wave)
 
-    # Otherwise, compute checksum and build the message wave
-    message_str = ''.join(valid_chars)
-    checksum_char = compute_checksum_char(message_str)
+    # If no recognized characters, send just preamble + silence
+    if len(tones) == 0:
+        out = np.zeros(preamble_len + _samples_per_tone, dtype=np.int16)
+        out[:preamble_len] = _preamble_wave
+        return out
 
-    message_tones = [tonebank[ch] for ch in valid_chars]
-    message_tones.append(tonebank[checksum_char])  # final chunk is your checksum
-    message_wave = np.concatenate(message_tones)
+    # Otherwise the final chunk is the checksum tone
+    # Write preamble, tones and postamble straight into one preallocated buffer;
+    # the tones are gathered from the tonebank rows in one go (the indices are
+    # already valid, and mode='clip' stops np.take from buffering `out`)
+    offset = preamble_len + len(tones) * _samples_per_tone
+    out = np.empty(offset + len(_postamble_wave), dtype=np.int16)
+    out[:preamble_len] = _preamble_wave
+    np.take(_tonebank_matrix, tones, axis=0, mode='clip',
+            out=out[preamble_len:offset].reshape(len(tones), _samples_per_tone))
+    out[offset:] = _postamble_wave
 
-    # Append postamble
-    postamble_wave = generate_postamble()
+    return out
 
-    return np.concatenate([generate_preamble(), message_wave, postamble_wave])
+def iter_waveform_chunks(text):
+    """
+    Same audio as encode_text_to_waveform, yielded one piece at a time
+    (preamble, each tone, postamble) so playback can start before the
+    whole message is assembled. The yielded arrays are cached; do not modify.
+    """
+    tones = _message_tones(text)
+    yield _preamble_wave
+    if len(tones) == 0:
+        yield np.zeros(_samples_per_tone, dtype=np.int16)
+        return
+    for idx in tones:
+        yield _tonebank_matrix[idx]
+    yield _postamble_wave
 
-def decode_waveform_to_text(waveform, tolerance=20, entropy_threshold=5.0):
+def decode_waveform_to_text(waveform, tolerance=None, entropy_threshold=BATCH_ENTROPY_THRESHOLD):
     """
     Decode audio waveform back to text with principled error awareness:
     - Finds the preamble tone to synchronize to the message start.
@@ -101,95 +346,235 @@ def decode_waveform_to_text(waveform, tolerance=20, entropy_threshold=5.0):
     - Tracks which chunks are high-entropy (i.e. uncertain), but still attempts to decode them.
     - Appends the indexes of uncertain chunks at the end of the message.
     - Uses the final decoded character as a checksum and flags mismatches.
+
+    `tolerance` is deprecated and ignored (passing it warns): chunks are measured
+    only at the exact transmitted frequencies, so a tone more than about one DFT
+    bin (~3 Hz) off its frequency is not recognized, and noise is rejected by
+    TONE_TO_NOISE_RATIO instead.
     """
-    def detect_freq(chunk):
-        windowed = np.hanning(len(chunk)) * chunk
-        fft_vals = np.fft.rfft(windowed)
-        freqs = np.fft.rfftfreq(len(chunk), 1 / SAMPLE_RATE)
-        return freqs[np.argmax(np.abs(fft_vals))]
-
-    def chunk_entropy(chunk):
-        windowed = np.hanning(len(chunk)) * chunk
-        fft_vals = np.fft.rfft(windowed)
-        magnitudes = np.abs(fft_vals)
-        total = np.sum(magnitudes)
-        if total == 0:
-            return float('inf')  # fully silent => treat as "infinite" uncertainty
-        p = magnitudes / total
-        return -np.sum(p * np.log2(p + 1e-12))
-
-    def match_freq_to_char(freq):
-        closest = min(freq_to_char.keys(), key=lambda f: abs(f - freq))
-        return freq_to_char[closest] if abs(freq - closest) < tolerance else ""
+    if tolerance is not None:
+        _warn_tolerance_ignored()
+
+    def decode_aligned(signal):
+        # View the signal as one chunk per row and analyze every chunk at once;
+        # the same magnitudes serve both frequency detection and entropy.
+        n_chunks = len(signal) // _samples_per_tone
+        chunks = signal[:n_chunks * _samples_per_tone].reshape(n_chunks, _samples_per_tone)
+        power = goertzel_bank(chunks)
+        tones = dominant_tone(power, chunks)
+
+        # Keep non-silent chunks up to the first postamble; everything after it
+        # is dropped before the entropy pass.
+        keep = power.any(axis=1)
+        postamble = np.flatnonzero(tones == _postamble_tone)
+        if postamble.size:
+            end = postamble[0]
+            power, tones, keep = power[:end], tones[:end], keep[:end]
+
+        entropies = entropy_bits(np.sqrt(power))
+
+        # Bank bins are ordered like CHARSET, so character tones are their own index
+        char_idxs = np.where(tones < len(CHARSET), tones, -1).astype(np.int8)
+        uncertain = entropies > entropy_threshold
+        return char_idxs[keep], uncertain[keep]
+
+    waveform = np.asarray(waveform)
+    if waveform.dtype.kind == 'i':
+        waveform = waveform / np.float32(np.iinfo(waveform.dtype).max + 1)  # PCM -> [-1, 1]
+    waveform = waveform.astype(np.float32, copy=False)
+
+    # Cross-correlate the first few seconds against the preamble tone and pick
+    # the best-matching offset.
+    search = waveform[:_preamble_search_samples]
+    if len(search) < _preamble_samples:
+        return ""
+    scores, present = _preamble_scores(search)
+    if not present.any():
+        return ""
+    preamble_found_at = int(np.argmax(np.where(present, scores, 0)))
+
+    message_signal = waveform[preamble_found_at + _preamble_samples:]
+    return _format_decoded(*decode_aligned(message_signal))
 
 class IncrementalDecoder:
     """
     A stateful, incremental decoder that processes new audio data chunk by chunk.
     It:
-      - Accumulates samples in a buffer.
+      - Accumulates samples in a preallocated buffer (no per-call allocation).
       - Searches for the preamble tone to synchronize.
       - Decodes full tone chunks incrementally (using _samples_per_tone).
       - Stops decoding when the postamble tone is detected.
       - Stores decoded characters (with uncertainty flags) for checksum validation.
+
+    `tolerance` is deprecated and ignored, as for decode_waveform_to_text.
     """
-    def __init__(self, tolerance=20, entropy_threshold=10.0):
-        self.tolerance = tolerance
+    def __init__(self, tolerance=None, entropy_threshold=STREAM_ENTROPY_THRESHOLD):
+        if tolerance is not None:
+            _warn_tolerance_ignored()
         self.entropy_threshold = entropy_threshold
-        self.buffer = np.array([], dtype=np.float32)
+        self.buffer = np.empty(_decoder_buffer_samples, dtype=np.float32)
+        self.write_index = 0  # End of valid samples in the buffer
         self.last_decoded_index = 0  # Pointer into the buffer (in samples)
+        self.search_index = 0  # First preamble window offset not yet scored
+        self.preamble_candidate = None  # First window offset that looked like the preamble
         self.preamble_found = False
+        # Sliding Goertzel state for the preamble search, carried across calls:
+        # running sums (from buffer[0]) of the mixed-down samples and of their
+        # energy, up to summed_index, plus scratch space for scoring windows
+        self.stream_offset = 0  # Absolute stream position of buffer[0], for the mixer phase
+        self.summed_index = 0
+        self.mixed_sums = np.zeros(_decoder_buffer_samples + 1, dtype=complex)
+        self.energy_sums = np.zeros(_decoder_buffer_samples + 1)
+        self.window_sums = np.empty(_decoder_buffer_samples, dtype=complex)
+        self.window_power = np.empty(_decoder_buffer_samples)
+        self.window_floor = np.empty(_decoder_buffer_samples)
+        self.window_present = np.empty(_decoder_buffer_samples, dtype=bool)
         self.done = False
-        self.decoded_info = []  # List of (character, uncertain flag)
+        # Decoded chunks as parallel arrays: CHARSET index (-1 = no match) and uncertain flag
+        self.char_idxs = np.empty(_decoded_capacity, dtype=np.int8)
+        self.uncertain = np.empty(_decoded_capacity, dtype=bool)
+        self.n_decoded = 0
     
     def feed_samples(self, new_samples):
-        """Append new_samples to the internal buffer and process new complete chunks."""
-        self.buffer = np.concatenate((self.buffer, new_samples))
+        """
+        Copy new_samples into the internal buffer and process new complete chunks.
+        Accepts float samples in [-1, 1] or integer PCM (e.g. int16 straight from
+        the sound card), which is rescaled to the same range as it is copied.
+        """
+        pcm_scale = 1 / (np.iinfo(new_samples.dtype).max + 1) if new_samples.dtype.kind == 'i' else None
+        while len(new_samples) and not self.done:
+            if self.write_index == len(self.buffer):
+                self.compact()
+            n = min(len(new_samples), len(self.buffer) - self.write_index)
+            dest = self.buffer[self.write_index : self.write_index + n]
+            np.copyto(dest, new_samples[:n])
+            if pcm_scale is not None:
+                dest *= pcm_scale
+            self.write_index += n
+            new_samples = new_samples[n:]
+            self.process_buffer()
+    
+    def compact(self):
+        """Moves the samples still needed to the front of the buffer and shifts the pointers."""
+        if self.preamble_found:
+            keep_from = self.last_decoded_index
+        elif self.preamble_candidate is not None:
+            keep_from = self.preamble_candidate
+        else:
+            keep_from = self.search_index
+        keep_from = min(keep_from, self.write_index)
+        kept = self.write_index - keep_from
+        self.buffer[:kept] = self.buffer[keep_from : self.write_index]
+        self.write_index = kept
+        self.stream_offset += keep_from
+        if not self.preamble_found:
+            # Rebase the running sums on the new buffer[0]
+            summed = self.summed_index - keep_from
+            self.mixed_sums[:summed + 1] = self.mixed_sums[keep_from : self.summed_index + 1]
+            self.mixed_sums[:summed + 1] -= self.mixed_sums[0]
+            self.energy_sums[:summed + 1] = self.energy_sums[keep_from : self.summed_index + 1]
+            self.energy_sums[:summed + 1] -= self.energy_sums[0]
+            self.summed_index = summed
+        self.last_decoded_index -= keep_from
+        self.search_index -= keep_from
+        if self.preamble_candidate is not None:
+            self.preamble_candidate -= keep_from
+    
+    def process_buffer(self):
+        """Looks for the preamble, then decodes every complete chunk after it."""
+        # If preamble not yet found, look for it.
+        if not self.preamble_found:
+            self.preamble_found = self.find_preamble()
+            if not self.preamble_found:
+                return
         # Process complete chunks only from last_decoded_index to end.
-        while self.last_decoded_index + _samples_per_tone <= len(self.buffer):
+        while self.last_decoded_index + _samples_per_tone <= self.write_index:
             chunk = self.buffer[self.last_decoded_index : self.last_decoded_index + _samples_per_tone]
-            # If preamble not yet found, look for it.
-            if not self.preamble_found:
-                freq = self.detect_freq(chunk)
-                if abs(freq - PREAMBLE_FREQ) < self.tolerance:
-                    self.preamble_found = True
-                self.last_decoded_index += _samples_per_tone
-                continue
-            
-            # If preamble found, check for postamble.
-            freq = self.detect_freq(chunk)
-            if abs(freq - POSTAMBLE_FREQ) < self.tolerance:
+            # Preamble found, check for postamble.
+            freq, entropy = analyze_chunk(chunk)
+            if freq == POSTAMBLE_FREQ:
                 self.done = True
                 self.last_decoded_index += _samples_per_tone
                 break  # Stop processing further chunks
             
             # Otherwise, decode this chunk as a character.
-            char = self.match_freq_to_char(freq)
-            uncertain = (self.chunk_entropy(chunk) > self.entropy_threshold)
-            self.decoded_info.append((char, uncertain))
+            if self.n_decoded == len(self.char_idxs):
+                self.char_idxs = np.concatenate((self.char_idxs, np.empty_like(self.char_idxs)))
+                self.uncertain = np.concatenate((self.uncertain, np.empty_like(self.uncertain)))
+            self.char_idxs[self.n_decoded] = match_freq_to_index(freq)
+            self.uncertain[self.n_decoded] = entropy > self.entropy_threshold
+            self.n_decoded += 1
             self.last_decoded_index += _samples_per_tone
     
+    def find_preamble(self):
+        """
+        Scores the preamble-length windows that became complete since the last call
+        (a sliding Goertzel at PREAMBLE_FREQ). Only the new samples are mixed and
+        added to the running sums, and every window is a difference of two sums, all
+        in preallocated arrays. Once a window shows the preamble above the noise
+        floor, waits for one more preamble length of audio, then locks onto the
+        best-scoring offset and points last_decoded_index at the first message tone.
+        Returns True once the preamble has been located.
+        """
+        if self.preamble_candidate is None:
+            start, end = self.summed_index, self.write_index
+            phase = (self.stream_offset + start) % _preamble_mixer_period
+            # Widen the new samples to float64 first (window_power is free until the
+            # windows are scored) so no product below needs a casting buffer
+            samples = self.window_power[:end - start]
+            np.copyto(samples, self.buffer[start:end])
+            mixer = _preamble_mixer[phase : phase + len(samples)]
+            mixed = self.mixed_sums[start + 1 : end + 1]
+            np.multiply(samples, mixer.real, out=mixed.real)
+            np.multiply(samples, mixer.imag, out=mixed.imag)
+            np.cumsum(mixed, out=mixed)
+            mixed += self.mixed_sums[start]
+            energy = self.energy_sums[start + 1 : end + 1]
+            np.multiply(samples, samples, out=energy)
+            np.cumsum(energy, out=energy)
+            energy += self.energy_sums[start]
+            self.summed_index = end
+
+            # Windows starting at search_index .. end - _preamble_samples are now complete
+            first = self.search_index
+            n = end - _preamble_samples - first + 1
+            if n <= 0:
+                return False
+            window = self.window_sums[:n]
+            np.subtract(self.mixed_sums[first + _preamble_samples : end + 1], self.mixed_sums[first : first + n], out=window)
+            power = self.window_power[:n]
+            np.abs(window, out=power)
+            np.square(power, out=power)
+            floor = self.window_floor[:n]
+            np.subtract(self.energy_sums[first + _preamble_samples : end + 1], self.energy_sums[first : first + n], out=floor)
+            floor *= TONE_TO_NOISE_RATIO
+            present = self.window_present[:n]
+            np.greater(power, floor, out=present)
+            hit = int(present.argmax())
+            if not present[hit]:
+                self.search_index += n
+                return False
+            self.preamble_candidate = first + hit
+
+        # The best alignment lies within one preamble length of the first hit.
+        start = self.preamble_candidate
+        if start + 2 * _preamble_samples > self.write_index:
+            return False
+        scores, present = _preamble_scores(self.buffer[start : start + 2 * _preamble_samples])
+        self.last_decoded_index = start + int(np.argmax(np.where(present, scores, 0))) + _preamble_samples
+        return True
+    
     def detect_freq(self, chunk):
-        """Detects the dominant frequency in a chunk using FFT and a Hanning window."""
-        windowed = np.hanning(len(chunk)) * chunk
-        fft_vals = np.fft.rfft(windowed)
-        freqs = np.fft.rfftfreq(len(chunk), 1/SAMPLE_RATE)
-        return freqs[np.argmax(np.abs(fft_vals))]
+        """Detects which of the known tones (TARGET_FREQS) dominates a chunk; 0 Hz if none does."""
+        return detect_freq(chunk)
     
     def chunk_entropy(self, chunk):
-        """Calculates Shannon entropy of the FFT magnitudes of a chunk."""
-        windowed = np.hanning(len(chunk)) * chunk
-        fft_vals = np.fft.rfft(windowed)
-        magnitudes = np.abs(fft_vals)
-        total = np.sum(magnitudes)
-        if total == 0:
-            return float('inf')
-        p = magnitudes / total
-        return -np.sum(p * np.log2(p + 1e-12))
+        """Calculates Shannon entropy of the Goertzel bank magnitudes of a chunk."""
+        return chunk_entropy(chunk)
     
     def match_freq_to_char(self, freq):
         """Maps a detected frequency to the closest valid character."""
-        closest = min(freq_to_char.keys(), key=lambda f: abs(f - freq))
-        return freq_to_char[closest] if abs(freq - closest) < self.tolerance else ""
+        return match_freq_to_char(freq)
     
     def get_message(self):
         """
@@ -198,36 +583,9 @@ class IncrementalDecoder:
         Uncertain characters (flagged during decoding) are reported by their
         1-based positions in the final message.
         """
-        if not self.decoded_info:
-            return ""
-        
-        # If fewer than 2 characters decoded, no checksum is available.
-        if len(self.decoded_info) < 2:
-            msg = "".join(char for char, _ in self.decoded_info)
-            uncertain_positions = [i+1 for i, (char, uncertain) in enumerate(self.decoded_info) if uncertain and char]
-            if uncertain_positions:
-                friendly = [f"#{pos}" for pos in uncertain_positions]
-                msg += f" [UNCERTAIN characters at positions {', '.join(friendly)}]"
-            return msg
-        
-        # Otherwise, assume the final chunk is the checksum.
-        *message_info, checksum_info = self.decoded_info
-        message_chars = [char for char, _ in message_info]
-        message_str = "".join(message_chars)
-        message_for_cs = "".join(c for c in message_chars if c)
-        expected_cs = compute_checksum_char(message_for_cs)
-        actual_cs = checksum_info[0]
-        
-        result = message_str
-        if actual_cs != expected_cs:
-            result += " [CHECKSUM MISMATCH]"
-        
-        uncertain_positions = [i+1 for i, (char, uncertain) in enumerate(message_info) if uncertain and char]
-        if uncertain_positions:
-            friendly = [f"#{pos}" for pos in uncertain_positions]
-            result += f" [UNCERTAIN characters at positions {', '.join(friendly)}]"
-        
-        return result
+        # Read the count first: the audio thread grows the arrays before the count passes their length
+        n = self.n_decoded
+        return _format_decoded(self.char_idxs[:n], self.uncertain[:n])
 
     def is_done(self):
         """Returns True if the postamble has been detected and decoding is complete."""
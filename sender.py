@@ -1,14 +1,12 @@
 import tkinter as tk
 import sounddevice as sd
 from protocol import (
-    encode_text_to_waveform,
+    iter_waveform_chunks,
+    is_valid_text,
     SAMPLE_RATE,
     set_transmission_params,
 )
 
-# Supported characters
-CHARSET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789 .,?!"
-
 class AcousticSenderGUI:
     def __init__(self, master):
         self.master = master
@@ -51,7 +49,7 @@ class AcousticSenderGUI:
 
     def is_valid_message(self, text):
         """Checks if all characters are within the supported CHARSET."""
-        return all(char in CHARSET for char in text.upper())
+        return is_valid_text(text)
 
     def send_message(self):
         """Handles message validation, encoding, and playback."""
@@ -79,10 +77,10 @@ class AcousticSenderGUI:
         self.status_label.config(text=f"Transmitting: '{text}'", fg="green")
         self.master.update()
 
-        # Encode the message into audio and play it
-        waveform = encode_text_to_waveform(text)
-        sd.play(waveform, SAMPLE_RATE)
-        sd.wait()
+        # Encode the message into audio and play it, one tone at a time
+        with sd.OutputStream(samplerate=SAMPLE_RATE, channels=1, dtype='int16') as stream:
+            for chunk in iter_waveform_chunks(text):
+                stream.write(chunk)
 
         # Show done status
         self.status_label.config(text="Done transmitting!", fg="blue")